@@ -8,7 +8,8 @@ from playhouse.flask_utils import FlaskDB
 
 from character_creators.models import database as db
 from character_creators.resource import Resource
-from character_creators.settings import SECRET_KEY, CACHE_HOST, CACHE_PREFIX
+from character_creators.settings import SECRET_KEY, CACHE_HOST, CACHE_PREFIX, SNAPSHOT_PATH
+from character_creators.snapshot import open_snapshot
 
 # Initialize the application
 app = Flask(__name__)
@@ -21,6 +22,10 @@ app.config["SECRET_KEY"] = SECRET_KEY
 errors = {'BadRequest': {'code': 400}, 'NotFound': {'code': 404}}
 api = Api(app, errors=errors, catch_all_404s=True)
 
+# Serve from the loader's read-only snapshot when configured, no MariaDB needed.
+if SNAPSHOT_PATH:
+    db = open_snapshot(SNAPSHOT_PATH)
+
 # Wrap database connection within app context 
 db_wrapper = FlaskDB(app, db)
 
@@ -66,6 +71,28 @@ class CharacterCreators(MethodView):
         return res
 
 
+class CreatorCharacters(MethodView):
+    """
+    The /creators/<id>/characters entity.
+    """
+
+    def get(self, id):
+        """
+        Method GET:
+
+        Get all characters created by the creator that matches the creator ID.
+
+        :param int id: The creator ID
+        :return res: Returns cached or live db record
+        """
+        cache_key = f"creators_{id}"
+        res = cache.get(cache_key)
+        if not res:
+            res = Resource().get_characters_by_creator_id(id)
+            cache.set(cache_key, res)
+        return res
+
+
 class Creators(MethodView):
     """
     The /creators entity. Accepts 'character_name' query param ONLY.
@@ -100,4 +127,5 @@ class Creators(MethodView):
 
 # Resource routing
 api.add_resource(CharacterCreators, "/api/v1/characters/<int:id>/creators")
+api.add_resource(CreatorCharacters, "/api/v1/creators/<int:id>/characters")
 api.add_resource(Creators, "/api/v1/creators")
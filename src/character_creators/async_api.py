@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import pickle
+
+import aiomysql
+import aioredis
+from quart import Quart, jsonify, request
+from quart.views import MethodView
+
+from character_creators.models import database as db
+from character_creators.resource import Resource
+from character_creators.settings import (DB_HOST, DB_USER, DB_PASS, CACHE_HOST, CACHE_PREFIX,
+        SNAPSHOT_PATH, ASYNC_DB_POOL_SIZE, ASYNC_CACHE_POOL_SIZE)
+from character_creators.snapshot import open_snapshot
+
+# Same expiry as the Flask app cache, so both apps can share entries.
+CACHE_TIMEOUT = 300
+
+# Initialize the ASGI application, a sibling of the Flask app in api.py.
+app = Quart(__name__)
+app.logger.setLevel(logging.INFO)
+
+# Serve from the loader's read-only snapshot when configured, no MariaDB needed.
+snapshot = open_snapshot(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+
+# Pools are created once the event loop is running.
+pools = {}
+
+# In-flight cache misses: concurrent requests for the same key share one query.
+inflight = {}
+
+
+@app.before_serving
+async def create_pools():
+    """
+    Create the Redis and MariaDB connection pools.
+    """
+    pools["cache"] = await aioredis.create_redis_pool(f"redis://{CACHE_HOST}:6379",
+                                                      maxsize=ASYNC_CACHE_POOL_SIZE)
+    if not snapshot:
+        pools["db"] = await aiomysql.create_pool(host=DB_HOST, user=DB_USER, password=DB_PASS,
+                                                 db=db.database, maxsize=ASYNC_DB_POOL_SIZE,
+                                                 autocommit=True, charset="utf8mb4")
+
+
+@app.after_serving
+async def close_pools():
+    """
+    Close the Redis and MariaDB connection pools.
+    """
+    pools["cache"].close()
+    await pools["cache"].wait_closed()
+    if "db" in pools:
+        pools["db"].close()
+        await pools["db"].wait_closed()
+
+
+async def cache_get(key):
+    """
+    Get a cached value, stored in the Flask-Caching Redis format.
+
+    :param str key: The cache key, without prefix
+    :return: The cached value, or None
+    """
+    value = await pools["cache"].get(CACHE_PREFIX + key)
+    if value and value.startswith(b"!"):
+        return pickle.loads(value[1:])
+    return None
+
+
+async def cache_set(key, value):
+    """
+    Cache a value in the Flask-Caching Redis format.
+
+    :param str key: The cache key, without prefix
+    :param value: The value to cache
+    """
+    await pools["cache"].setex(CACHE_PREFIX + key, CACHE_TIMEOUT, b"!" + pickle.dumps(value))
+
+
+async def query(method, *args):
+    """
+    Run a Resource query method without blocking the event loop.
+
+    The query is built by Resource and executed on the aiomysql pool, then
+    turned into the response by the method's own response builder. With a
+    snapshot, the (memory-mapped) sqlite query runs in the default executor.
+
+    :param method: A decorated Resource method
+    :param args: The method arguments
+    :return res: The response
+    :rtype: dict
+    """
+    if snapshot:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, method, Resource(), *args)
+
+    sql, params = method.__wrapped__(Resource(), *args).sql()
+    async with pools["db"].acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(sql, params)
+            rows = await cur.fetchall()
+    return method.info(rows)
+
+
+async def cached(key, method, *args):
+    """
+    Get a cached response, or query and cache it.
+
+    Concurrent misses on the same key wait on a single query, so a cache
+    miss storm costs one database round trip per key.
+
+    :param str key: The cache key
+    :param method: A decorated Resource method
+    :param args: The method arguments
+    :return res: Returns cached or live db record
+    :rtype: dict
+    """
+    res = await cache_get(key)
+    if res:
+        return res
+
+    async def _fetch():
+        res = await query(method, *args)
+        await cache_set(key, res)
+        return res
+
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch())
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+@app.errorhandler(404)
+async def not_found(error):
+    """
+    Keep the Flask-RESTful JSON error body for unknown routes.
+    """
+    return jsonify(message="The requested URL was not found on the server."), 404
+
+
+class CharacterCreators(MethodView):
+    """
+    The /characters/<id>/creators entity.
+    """
+
+    async def get(self, id):
+        """
+        Method GET:
+
+        Get all character creators that matches the character ID.
+
+        :param int id: The character ID
+        :return res: Returns cached or live db record
+        """
+        return jsonify(await cached(str(id), Resource.get_creators_by_character_id, id))
+
+
+class CreatorCharacters(MethodView):
+    """
+    The /creators/<id>/characters entity.
+    """
+
+    async def get(self, id):
+        """
+        Method GET:
+
+        Get all characters created by the creator that matches the creator ID.
+
+        :param int id: The creator ID
+        :return res: Returns cached or live db record
+        """
+        return jsonify(await cached(f"creators_{id}", Resource.get_characters_by_creator_id, id))
+
+
+class Creators(MethodView):
+    """
+    The /creators entity. Accepts 'character_name' query param ONLY.
+    All other query params will return 400.
+    """
+
+    async def get(self):
+        """
+        Method GET:
+
+        Get all available creators. If a query param 'character_name'
+        is given, then return creators for that character.
+
+        :return res: Returns cached or live db record
+        """
+        unknown = set(request.args) - {"character_name"}
+        if unknown:
+            return jsonify(message=f"Unknown arguments: {', '.join(sorted(unknown))}"), 400
+        c_name = str(request.args.get("character_name")).lower()
+        if c_name == "none":
+            return jsonify(await cached(f"characters_{c_name}", Resource.get_creators))
+        if not c_name:
+            return jsonify(message="character_name argument cannot be empty"), 400
+        return jsonify(await cached(f"characters_{c_name}",
+                                    Resource.get_creators_by_character_name, c_name))
+
+# Resource routing
+app.add_url_rule("/api/v1/characters/<int:id>/creators",
+                 view_func=CharacterCreators.as_view("character_creators"))
+app.add_url_rule("/api/v1/creators/<int:id>/characters",
+                 view_func=CreatorCharacters.as_view("creator_characters"))
+app.add_url_rule("/api/v1/creators", view_func=Creators.as_view("creators"))
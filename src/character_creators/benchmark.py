@@ -0,0 +1,123 @@
+import argparse
+import logging
+from statistics import mean, median
+import time
+
+from character_creators.loader import legacy_fk_indexes
+from character_creators.models import (CharacterSeries, CreatorSeries, CharacterCreators,
+        database as db)
+from character_creators.resource import Resource
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.StreamHandler())
+logger.setLevel(logging.INFO)
+
+# Foreign key lookups as (model, key field, selected field).
+LOOKUPS = [
+    (CharacterCreators, CharacterCreators.creator, CharacterCreators.character),
+    (CreatorSeries, CreatorSeries.creator, CreatorSeries.series_id),
+    (CharacterSeries, CharacterSeries.character, CharacterSeries.series_id),
+]
+
+
+def _leading_index(model, field):
+    """
+    Get the name of the index led by the given field.
+
+    :param Model model: The model to look into
+    :param Field field: The leading field
+    :returns: The index name
+    :rtype: str
+    """
+    for index in model._meta.fields_to_index():
+        if index._expressions[0] is field:
+            return index._name
+
+
+def _lookup_sql(model, key, value, ignore=None):
+    """
+    Build the raw lookup SQL, optionally hiding indexes from the optimizer.
+
+    :param Model model: The model to query
+    :param Field key: The field to filter on
+    :param Field value: The field to select
+    :param list ignore: Index names to ignore, defaults to None
+    :returns: The SQL string
+    :rtype: str
+    """
+    hint = f" IGNORE INDEX ({', '.join(ignore)})" if ignore else ""
+    return (f"SELECT {value.column_name} FROM {model._meta.table_name}{hint} "
+            f"WHERE {key.column_name} = %s")
+
+
+def _timings(func, ids):
+    """
+    Time a function call for every id.
+
+    :param callable func: Called with a single id
+    :param list ids: The ids to look up
+    :returns: Latencies in milliseconds
+    :rtype: list
+    """
+    result = []
+    for _id in ids:
+        start = time.perf_counter()
+        func(_id)
+        result.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def _report(label, timings):
+    """
+    Log a latency summary.
+
+    :param str label: The row label
+    :param list timings: Latencies in milliseconds
+    """
+    p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+    logger.info(f"  {label:<8} mean {mean(timings):8.3f} ms   median {median(timings):8.3f} ms"
+                f"   p95 {p95:8.3f} ms")
+
+
+def run(samples):
+    """
+    Print EXPLAIN plans and latencies before (indexes ignored) and after.
+
+    :param int samples: Number of random ids to look up per query
+    """
+    for model, key, value in LOOKUPS:
+        table = model._meta.table_name
+        index = _leading_index(model, key)
+        # A database not upgraded yet still has the legacy foreign key index,
+        # hide it too so "before" is the scan the covering index replaces.
+        existing = {idx.name for idx in db.get_indexes(table)}
+        hidden = [index] + [name for name in legacy_fk_indexes(model) if name in existing]
+        ids = [row[0] for row in db.execute_sql(
+            f"SELECT DISTINCT {key.column_name} FROM {table} ORDER BY RAND() LIMIT %s",
+            (samples,))]
+        if not ids:
+            logger.info(f"{table}: no rows, skipped")
+            continue
+
+        logger.info(f"{table} by {key.column_name} ({index})")
+        for label, ignore in (("before", hidden), ("after", None)):
+            sql = _lookup_sql(model, key, value, ignore)
+            for row in db.execute_sql(f"EXPLAIN {sql}", (ids[0],)):
+                logger.info(f"  {label:<8} EXPLAIN {row}")
+            _report(label, _timings(lambda _id: db.execute_sql(sql, (_id,)).fetchall(), ids))
+
+    ids = [row[0] for row in db.execute_sql(
+        "SELECT DISTINCT creator_id FROM character_creators ORDER BY RAND() LIMIT %s",
+        (samples,))]
+    if ids:
+        logger.info("/api/v1/creators/<id>/characters resource (uncached)")
+        _report("after", _timings(Resource().get_characters_by_creator_id, ids))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the creator-centric indexes.")
+    parser.add_argument("--samples", type=int, default=200,
+                        help="random ids to look up per query (default: 200)")
+    args = parser.parse_args()
+    with db:
+        run(args.samples)
@@ -1,40 +1,203 @@
+import argparse
+from contextlib import contextmanager
+from functools import wraps
 import logging
 from math import ceil
 import sys
 import time
 
 from peewee import *
+from peewee import CommaNodeList, EnclosedNodeList, Entity, ModelIndex, NodeList, SCOPE_VALUES
 from tqdm import tqdm
 
-from character_creators.settings import PRIVATE_KEY as pr, PUBLIC_KEY as pb, API_BASE as base
+from character_creators.settings import (PRIVATE_KEY as pr, PUBLIC_KEY as pb, API_BASE as base,
+        SNAPSHOT_DIR)
 from character_creators.models import (Character, CharacterSeries, Creator, CreatorSeries,
         CharacterCreators, database as db)
 from character_creators.marvel import MarvelApi
+from character_creators.profiler import NullProfiler, Profiler
+from character_creators.snapshot import export_snapshot, latest_snapshot
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.StreamHandler())
 logger.setLevel(logging.INFO)
 
 
+# Tables carrying secondary and unique indexes, built last in bulk mode.
+LINK_MODELS = [CharacterSeries, CreatorSeries, CharacterCreators]
+
+
+def legacy_fk_indexes(model):
+    """
+    Get the names of the single-column foreign key indexes older versions
+    of the models created. The composite indexes led by the same columns
+    make them redundant.
+
+    :param Model model: The link model
+    :returns: Index names
+    :rtype: list
+    """
+    declared = {index._name for index in model._meta.fields_to_index()}
+    names = [ModelIndex(model, (field,))._name for field in model._meta.refs]
+    return [name for name in names if name not in declared]
+
+
+@contextmanager
+def _session(**settings):
+    r"""
+    Change session variables on the loader connection, restoring them after.
+
+    :param \**settings: Session variable names and values
+    """
+    names = ", ".join(f"@@SESSION.{name}" for name in settings)
+    prior = dict(zip(settings, db.execute_sql(f"SELECT {names}").fetchone()))
+    db.execute_sql("SET SESSION " + ", ".join(f"{k}={v}" for k, v in settings.items()))
+    try:
+        yield
+    finally:
+        db.execute_sql("SET SESSION " + ", ".join(f"{k}={v}" for k, v in prior.items()))
+
+
+@contextmanager
+def _deferred_foreign_keys(model):
+    """
+    Leave the foreign key constraints out of the model's CREATE TABLE.
+
+    :param Model model: The model to create
+    """
+    fields = list(model._meta.refs)
+    for field in fields:
+        field.deferred = True
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.deferred = False
+
+
+def profiled(entity):
+    """
+    Profiled: Attributes every stage timed during a load method to the
+    entity.
+
+    :param str entity: The entity being loaded
+    """
+    def decorator(method):
+        @wraps(method)
+        def _profiled(self, *args, **kwargs):
+            with self.profiler.run(entity):
+                return method(self, *args, **kwargs)
+        return _profiled
+    return decorator
+
+
 class Loader:
     """
     Database loader: Loads data onto Database.
 
+    In bulk mode, link tables that don't exist yet are created without
+    indexes or foreign keys. Rows are appended without unique checks, then
+    each table is de-duplicated and indexed in a single pass once loaded.
+
     :param api: The API client to collect data from
+    :param bool bulk: Defer index and constraint builds, defaults to False
+    :param Profiler profiler: Times the load stages, defaults to None
     """
 
-    def __init__(self, api):
+    def __init__(self, api, bulk=False, profiler=None):
         self.api = api
+        self.bulk = bulk
+        self.profiler = profiler or NullProfiler()
+        self._deferred = set()
         self._create_tables()
+        self._create_indexes()
 
     def _create_tables(self):
         """
         Create all required tables, if they don't exist.
         """
         with db:
-            db.create_tables([Character, CharacterSeries, Creator,
-                             CreatorSeries, CharacterCreators], safe=True)
+            db.create_tables([Character, Creator], safe=True)
+            for model in LINK_MODELS:
+                if self.bulk and not model.table_exists():
+                    with _deferred_foreign_keys(model):
+                        model._schema.create_table(safe=True)
+                    self._deferred.add(model)
+                else:
+                    model.create_table(safe=True)
+
+    def _create_indexes(self):
+        """
+        Create any indexes missing from existing tables.
+
+        MySQL has no 'CREATE INDEX IF NOT EXISTS', so tables created by an
+        older version of the models never pick up new indexes on their own.
+        """
+        with db:
+            for model in LINK_MODELS:
+                if model not in self._deferred:
+                    self._build_indexes(model)
+
+    def _build_indexes(self, model):
+        """
+        Build every missing index and foreign key of a table in one pass,
+        and drop the legacy single-column foreign key indexes it replaces.
+
+        MariaDB's 'ALTER IGNORE' drops the rows that would violate a new
+        unique index, so duplicates appended while the table was bare go
+        away in the same table rebuild.
+
+        :param Model model: The model whose table to complete
+        """
+        table = model._meta.table_name
+        existing = {idx.name for idx in db.get_indexes(table)}
+        linked = {fk.column for fk in db.get_foreign_keys(table)}
+        clauses = []
+        for index in model._meta.fields_to_index():
+            if index._name not in existing:
+                columns = EnclosedNodeList([Entity(f.column_name) for f in index._expressions])
+                clauses.append(NodeList((SQL("ADD UNIQUE INDEX" if index._unique else "ADD INDEX"),
+                                         Entity(index._name), columns)))
+        for field in model._meta.refs:
+            if field.column_name not in linked:
+                clauses.append(NodeList((SQL("ADD"), field.foreign_key_constraint())))
+        for name in legacy_fk_indexes(model):
+            if name in existing:
+                clauses.append(NodeList((SQL("DROP INDEX"), Entity(name))))
+
+        if clauses:
+            logger.info(f"Build {table} indexes...")
+            with _session(foreign_key_checks=0):
+                db.execute(NodeList((SQL("ALTER IGNORE TABLE"), model, CommaNodeList(clauses))),
+                           scope=SCOPE_VALUES)
+            self._deferred.discard(model)
+            logger.info(f"Build {table} indexes completed")
+
+    def _load_settings(self, model):
+        """
+        Session settings for loading: no foreign key checks, and no unique
+        checks either while the link table is deferred (bare). A table that
+        still has its unique index relies on them for 'on_conflict_replace'.
+
+        :param Model model: The link model being loaded
+        :returns: Session variable names and values
+        :rtype: dict
+        """
+        settings = {"foreign_key_checks": 0}
+        if model in self._deferred:
+            settings["unique_checks"] = 0
+        return settings
 
+    def _load_session(self, model):
+        """
+        Apply the load session settings on the loader connection.
+
+        :param Model model: The link model being loaded
+        :returns: A context manager
+        """
+        return _session(**self._load_settings(model))
+
+    @profiled("characters")
     def load_characters(self):
         """
         Load data into the characters table.
@@ -42,23 +205,27 @@ class Loader:
         total = self.api.get_total("characters")
         data = self.api.get_characters()
         logger.info("Load characters...")
-        db.execute_sql("SET FOREIGN_KEY_CHECKS=0")
-        with db.atomic(), tqdm(total=total, \
+        with self._load_session(CharacterSeries), db.atomic(), tqdm(total=total, \
                               desc="Loading",
                               ncols=100) as pbar:
             for character in data:
-                (Character
-                 .insert_many(character[0])
-                 .execute())
-                for series in character[1]:
-                    (CharacterSeries
-                     .insert_many(series)
-                     .on_conflict_replace()
+                with self.profiler.stage("insert"):
+                    (Character
+                     .insert_many(character[0])
                      .execute())
+                    for series in character[1]:
+                        query = CharacterSeries.insert_many(series)
+                        if CharacterSeries not in self._deferred:
+                            query = query.on_conflict_replace()
+                        query.execute()
+                self.profiler.rows("characters", 1)
+                self.profiler.rows("character_series", len(character[1]))
                 pbar.update()
-        db.execute_sql("SET FOREIGN_KEY_CHECKS=1")
+        with self.profiler.stage("index"):
+            self._build_indexes(CharacterSeries)
         logger.info("Load characters completed")
 
+    @profiled("creators")
     def load_creators(self):
         """
         Load data into the creators table.
@@ -66,41 +233,49 @@ class Loader:
         total = self.api.get_total("creators")
         data = self.api.get_creators()
         logger.info("Load creators...")
-        db.execute_sql("SET FOREIGN_KEY_CHECKS=0")
-        with db.atomic(), tqdm(total=total, \
+        with self._load_session(CreatorSeries), db.atomic(), tqdm(total=total, \
                               desc="Loading",
                               ncols=100) as pbar:
             for creator in data:
-                (Creator
-                 .insert_many(creator[0])
-                 .execute())
-                for series in creator[1]:
-                    (CreatorSeries
-                     .insert_many(series)
-                     .on_conflict_replace()
+                with self.profiler.stage("insert"):
+                    (Creator
+                     .insert_many(creator[0])
                      .execute())
+                    for series in creator[1]:
+                        query = CreatorSeries.insert_many(series)
+                        if CreatorSeries not in self._deferred:
+                            query = query.on_conflict_replace()
+                        query.execute()
+                self.profiler.rows("creators", 1)
+                self.profiler.rows("creator_series", len(creator[1]))
                 pbar.update()
-        db.execute_sql("SET FOREIGN_KEY_CHECKS=1")
+        with self.profiler.stage("index"):
+            self._build_indexes(CreatorSeries)
         logger.info("Load creators completed")
 
+    @profiled("character_creators")
     def load_character_creators(self):
         """
         Load data into the character_creators table.
         """
         data = self.get_normalize_relation()
-        total = data.count()
+        with self.profiler.stage("query"):
+            total = data.count()
+            data.execute()
         logger.info("Load character_creators...")
-        db.execute_sql("SET FOREIGN_KEY_CHECKS=0")
         chunk_size = 10000
         total_batches = ceil(total / chunk_size)
-        with db.atomic(), tqdm(total=total, desc="Loading", \
+        with self._load_session(CharacterCreators), db.atomic(), tqdm(total=total, desc="Loading", \
                     postfix=f"batch 0/{total_batches}", ncols=100) as pbar:
             for idx, batch in enumerate(chunked(data, chunk_size)):
-                CharacterCreators.insert_many(batch).execute()
+                with self.profiler.stage("insert"):
+                    CharacterCreators.insert_many(batch).execute()
+                self.profiler.rows("character_creators", len(batch))
                 pbar.set_postfix_str(f"batch {idx + 1}/{total_batches}")
                 pbar.update(chunk_size)
 
-        db.execute_sql("SET FOREIGN_KEY_CHECKS=1")
+        with self.profiler.stage("index"):
+            self._build_indexes(CharacterCreators)
         logger.info("Load character_creators completed")
 
     def get_normalize_relation(self):
@@ -122,8 +297,35 @@ class Loader:
 
         return query.dicts()
 
+    @profiled("snapshot")
+    def export_snapshot(self, directory):
+        """
+        Export the loaded data into a versioned, read-only snapshot file.
+
+        :param str directory: The directory to write the snapshot into
+        :return: The path of the new snapshot
+        :rtype: str
+        """
+        logger.info("Export snapshot...")
+        with db:
+            path = export_snapshot(directory)
+        logger.info(f"Export snapshot completed: {path}")
+        return path
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load Marvel characters and creators.")
+    parser.add_argument("--bulk", action="store_true",
+                        help="create new tables bare and build indexes after loading")
+    parser.add_argument("--profile", nargs="?", const="loader-profile.json", metavar="REPORT",
+                        help="time each load stage and write a JSON run report "
+                             "(default: loader-profile.json)")
+    parser.add_argument("--profile-stats", metavar="STATS",
+                        help="with --profile, also dump cProfile stats of the transform stage")
+    args = parser.parse_args()
+    if args.profile_stats and not args.profile:
+        parser.error("--profile-stats requires --profile")
+
     print("Waiting for db (ctrl + c to exit) ", end="")
     while True:
         try:
@@ -138,22 +340,42 @@ if __name__ == "__main__":
             except KeyboardInterrupt:
                 sys.exit()
 
-    marvel = MarvelApi(base, pb, pr)
-    loader = Loader(marvel)
+    profiler = None
+    if args.profile:
+        profiler = Profiler(cprofile_stages=["transform"] if args.profile_stats else None)
+
+    marvel = MarvelApi(base, pb, pr, profiler=profiler)
+    loader = Loader(marvel, bulk=args.bulk, profiler=profiler)
+    loaded = False
     if (not Character.table_exists()) or (not len(Character)):
         loader.load_characters()
+        loaded = True
     else:
         logger.info("characters table exist and loaded")
 
     if (not Creator.table_exists()) or (not len(Creator)):
         loader.load_creators()
+        loaded = True
     else:
         logger.info("creators table exist and loaded")
 
     if (not CharacterCreators.table_exists()) or (not len(CharacterCreators)):
         loader.load_character_creators()
+        loaded = True
     else:
         logger.info("character_creators table exist and loaded")
 
+    if SNAPSHOT_DIR:
+        if loaded or not latest_snapshot(SNAPSHOT_DIR):
+            loader.export_snapshot(SNAPSHOT_DIR)
+        else:
+            logger.info("snapshot exist and up to date")
+
     logger.info(f"Total API calls: {marvel.calls}")
+    if profiler:
+        profiler.write(args.profile, calls=marvel.calls)
+        logger.info(f"Profile report written to {args.profile}")
+        if args.profile_stats:
+            profiler.dump_stats(args.profile_stats)
+            logger.info(f"Transform stage stats written to {args.profile_stats}")
     logger.info("Goodbye!")
@@ -5,6 +5,8 @@ import time
 
 from stringcase import snakecase
 
+from character_creators.profiler import NullProfiler
+
 
 class MarvelApi:
     """
@@ -14,14 +16,17 @@ class MarvelApi:
     :param str public_key: The public key for authorization
     :param str private_key: The private key for authorization
     :param int batch:  The total items per batch, defaults to 100
+    :param Profiler profiler: Times the http, decode and transform stages,
+        defaults to None
     """
 
-    def __init__(self, api_base, public_key, private_key, batch=100):
+    def __init__(self, api_base, public_key, private_key, batch=100, profiler=None):
         self.calls = 0
         self.api_base = api_base
         self.pb_key = public_key
         self.pr_key = private_key
         self.batch = batch
+        self.profiler = profiler or NullProfiler()
 
     def _get_md5_digest(self, ts):
         """
@@ -70,7 +75,12 @@ class MarvelApi:
             params["limit"] = limit
         if offset:
             params["offset"] = offset
-        return requests.get(entity_endpoint, params=params, headers=headers)
+        start = time.perf_counter()
+        with self.profiler.stage("http"):
+            response = requests.get(entity_endpoint, params=params, headers=headers)
+        # raw.tell() counts the bytes read off the socket, before gzip decoding.
+        self.profiler.page(entity, offset, time.perf_counter() - start, response.raw.tell())
+        return response
 
     def get_total(self, entity):
         """
@@ -83,7 +93,8 @@ class MarvelApi:
         result = False
         response = self.get_response(entity, limit=1)
         if response.status_code == 200:
-            result = response.json()["data"]["total"]
+            with self.profiler.stage("decode"):
+                result = response.json()["data"]["total"]
         return result
 
     def get_entity(self, entity, keys):
@@ -98,7 +109,8 @@ class MarvelApi:
         response = self.get_response(entity)
 
         if response.status_code == 200:
-            r1 = response.json()
+            with self.profiler.stage("decode"):
+                r1 = response.json()
             if (("data" in r1) and
                 ("total" in r1["data"]) and
                 ("results" in r1["data"])
@@ -114,7 +126,8 @@ class MarvelApi:
                     for ofs in offsets:
                         response = self.get_response(entity, offset=ofs)
                         if response.status_code == 200:
-                            r2 = response.json()
+                            with self.profiler.stage("decode"):
+                                r2 = response.json()
                             if ("data" in r2) and ("results" in r2["data"]):
                                 results = r2["data"]["results"]
                                 for result in results:
@@ -153,9 +166,10 @@ class MarvelApi:
         response = self.get_entity("characters", keys)
 
         for res in response:
-            character = {key:res[key] for key in keys[:-1]}
-            s_ids = self._extract_ids(res, "series")
-            series = [{"series_id": s_id, "character_id": res["id"]} for s_id in s_ids]
+            with self.profiler.stage("transform"):
+                character = {key:res[key] for key in keys[:-1]}
+                s_ids = self._extract_ids(res, "series")
+                series = [{"series_id": s_id, "character_id": res["id"]} for s_id in s_ids]
             yield (character, series)
 
     def get_creators(self):
@@ -170,17 +184,18 @@ class MarvelApi:
         response = self.get_entity("creators", keys)
 
         for res in response:
-            creator = {}
-            for key in keys[:-1]:
-                if key == "thumbnail":
-                    creator[key] = json.dumps(res[key])
-                elif key == "resourceURI":
-                    creator["resource_uri"] = res[key]
-                else:
-                    creator[snakecase(key)] = res[key]
-
-            s_ids = self._extract_ids(res, "series")
-            series = [{"series_id": s_id, "creator_id": res["id"]} for s_id in s_ids]
+            with self.profiler.stage("transform"):
+                creator = {}
+                for key in keys[:-1]:
+                    if key == "thumbnail":
+                        creator[key] = json.dumps(res[key])
+                    elif key == "resourceURI":
+                        creator["resource_uri"] = res[key]
+                    else:
+                        creator[snakecase(key)] = res[key]
+
+                s_ids = self._extract_ids(res, "series")
+                series = [{"series_id": s_id, "creator_id": res["id"]} for s_id in s_ids]
             yield (creator, series)
 
     def _get_offsets(self, total):
@@ -22,11 +22,13 @@ class CharacterSeries(BaseModel):
                                 field="id",
                                 model=Character,
                                 null=True,
+                                index=False,
                                 backref="character_serieses")
     class Meta:
         table_name = "character_series"
         indexes = (
             (("series_id", "character"), True),
+            (("character", "series_id"), False),
         )
         primary_key = False
 
@@ -49,12 +51,14 @@ class CreatorSeries(BaseModel):
                               field="id",
                               model=Creator,
                               null=True,
+                              index=False,
                               backref="creator_serieses")
 
     class Meta:
         table_name = "creator_series"
         indexes = (
             (("series_id", "creator"), True),
+            (("creator", "series_id"), False),
         )
         primary_key = False
 
@@ -63,15 +67,18 @@ class CharacterCreators(BaseModel):
     character = ForeignKeyField(column_name="character_id",
                                 field="id",
                                 model=Character,
+                                index=False,
                                 backref="character_series")
     creator = ForeignKeyField(column_name="creator_id",
                                 field="id",
                                 model=Creator,
+                                index=False,
                                 backref="creator_series")
 
     class Meta:
         table_name = "character_creators"
         indexes = (
             (("character", "creator"), True),
+            (("creator", "character"), False),
         )
         primary_key = False
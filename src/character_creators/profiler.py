@@ -0,0 +1,200 @@
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import cProfile
+from datetime import datetime
+import heapq
+import json
+import time
+
+
+class Profiler:
+    """
+    Loader profiler: Times each stage of a load run per entity.
+
+    Stage times are exclusive, a stage nested inside another (e.g. an HTTP
+    call made while transforming a result) is only counted once, under the
+    innermost stage.
+
+    :param int slowest: How many of the slowest pages to keep, defaults to 10
+    :param list cprofile_stages: Stages to run under cProfile, defaults to None
+    """
+
+    def __init__(self, slowest=10, cprofile_stages=None):
+        self.started = datetime.utcnow()
+        self.slowest = slowest
+        self.entities = {}
+        self.pages = []
+        self._entity = None
+        self._stack = []
+        self._cprofile_stages = set(cprofile_stages or [])
+        self._cprofile = cProfile.Profile() if self._cprofile_stages else None
+        self._cprofiling = False
+
+    def _entity_stats(self, entity):
+        """
+        Get or create the stats record of an entity.
+
+        :param str entity: The entity being loaded
+        :returns: The entity stats
+        :rtype: dict
+        """
+        if entity not in self.entities:
+            self.entities[entity] = {
+                "seconds": 0.0,
+                "rows": defaultdict(int),
+                "stages": defaultdict(lambda: {"calls": 0, "seconds": 0.0, "bytes": 0}),
+            }
+        return self.entities[entity]
+
+    def _toggle_cprofile(self, name):
+        """
+        Enable cProfile while the innermost stage is a profiled one.
+
+        :param str name: The innermost stage name, or None
+        """
+        enable = name in self._cprofile_stages
+        if self._cprofile and enable != self._cprofiling:
+            if enable:
+                self._cprofile.enable()
+            else:
+                self._cprofile.disable()
+            self._cprofiling = enable
+
+    @contextmanager
+    def run(self, entity):
+        """
+        Time a whole entity load. Stages entered inside are attributed to it.
+
+        :param str entity: The entity being loaded
+        """
+        stats = self._entity_stats(entity)
+        self._entity = entity
+        start = time.perf_counter()
+        try:
+            with self.stage("other"):
+                yield
+        finally:
+            stats["seconds"] += time.perf_counter() - start
+            self._entity = None
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a stage of the current entity load.
+
+        :param str name: The stage name, e.g. 'http', 'decode' or 'insert'
+        """
+        stats = self._entity_stats(self._entity)["stages"][name]
+        self._stack.append([name, 0.0])
+        self._toggle_cprofile(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _, nested = self._stack.pop()
+            parent = None
+            if self._stack:
+                self._stack[-1][1] += elapsed
+                parent = self._stack[-1][0]
+            stats["calls"] += 1
+            stats["seconds"] += elapsed - nested
+            self._toggle_cprofile(parent)
+
+    def page(self, entity, offset, seconds, size):
+        """
+        Record a fetched API page.
+
+        :param str entity: The marvel entity of the page
+        :param int offset: The page offset
+        :param float seconds: Time spent waiting on the page
+        :param int size: Response body size on the wire (still gzipped), in bytes
+        """
+        self._entity_stats(self._entity)["stages"]["http"]["bytes"] += size
+        page = (seconds, entity, offset or 0, size)
+        if len(self.pages) < self.slowest:
+            heapq.heappush(self.pages, page)
+        else:
+            heapq.heappushpop(self.pages, page)
+
+    def rows(self, table, count=1):
+        """
+        Count rows inserted into a table by the current entity load.
+
+        :param str table: The table name
+        :param int count: The number of rows, defaults to 1
+        """
+        self._entity_stats(self._entity)["rows"][table] += count
+
+    def report(self, calls=None):
+        """
+        Get the run report.
+
+        :param int calls: Total API calls made, defaults to None
+        :returns: A JSON serializable report
+        :rtype: dict
+        """
+        entities = {}
+        for entity, stats in self.entities.items():
+            if entity is None:
+                continue
+            rows = sum(stats["rows"].values())
+            seconds = stats["seconds"]
+            entities[entity] = {
+                "seconds": round(seconds, 3),
+                "rows": dict(stats["rows"]),
+                "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+                "stages": {name: {"calls": stage["calls"],
+                                  "seconds": round(stage["seconds"], 3),
+                                  "bytes": stage["bytes"]}
+                           for name, stage in stats["stages"].items()},
+            }
+        return {
+            "started": self.started.isoformat(),
+            "seconds": round((datetime.utcnow() - self.started).total_seconds(), 3),
+            "calls": calls,
+            "bytes": sum(e["stages"].get("http", {}).get("bytes", 0) for e in entities.values()),
+            "entities": entities,
+            "slowest_pages": [{"entity": entity, "offset": offset,
+                               "seconds": round(seconds, 3), "bytes": size}
+                              for seconds, entity, offset, size
+                              in sorted(self.pages, reverse=True)],
+        }
+
+    def write(self, path, calls=None):
+        """
+        Write the run report as JSON.
+
+        :param str path: The report file path
+        :param int calls: Total API calls made, defaults to None
+        """
+        with open(path, "w") as f:
+            json.dump(self.report(calls), f, indent=2)
+
+    def dump_stats(self, path):
+        """
+        Dump the cProfile stats of the profiled stages (pstats format, for
+        snakeviz, flameprof or gprof2dot).
+
+        :param str path: The stats file path
+        """
+        if self._cprofile:
+            self._cprofile.dump_stats(path)
+
+
+class NullProfiler:
+    """
+    No-op stand-in for Profiler, used when a load run isn't profiled.
+    """
+
+    def run(self, entity):
+        return nullcontext()
+
+    def stage(self, name):
+        return nullcontext()
+
+    def page(self, entity, offset, seconds, size):
+        pass
+
+    def rows(self, table, count=1):
+        pass
@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import wraps
 import json
 
 from peewee import *
@@ -6,46 +7,88 @@ from stringcase import camelcase
 from character_creators.models import Character, CharacterSeries, Creator, CreatorSeries, CharacterCreators
 
 
-def info_wrapper(method):
+def _info(total_key, total, data):
+    """
+    Wrap response data with the common info fields.
+
+    :param str total_key: The total field name, e.g. 'totalCreators'
+    :param int total: The total count
+    :param dict data: The response data
+    :return: The response
+    :rtype: dict
+    """
+    return {"code": 200,
+            "attributionText": f"Data provided by Marvel. © {datetime.now().year} MARVEL",
+            total_key: total,
+            "data": data}
+
+def creators_info(rows):
+    """
+    Build the creators response from query rows.
+
+    :param list rows: Rows as dicts
+    :return: The response
+    :rtype: dict
+    """
+    rows = list(rows)
+    data = {}
+    if rows:
+        if "character_id" in rows[0]:
+            data["characterId"] = rows[0]["character_id"]
+            data["characterName"] = rows[0]["character_name"]
+
+        data["creators"] = []
+
+        for qry in rows:
+            corrected_keys = {}
+            for k, v in qry.items():
+                if "character" not in k:
+                    k = "resourceURI" if k == "resource_uri" else camelcase(k)
+                    v = json.loads(v) if k == "thumbnail" else v
+                    corrected_keys[k] = v
+            data["creators"].append(corrected_keys)
+    return _info("totalCreators", len(rows), data)
+
+def characters_info(rows):
+    """
+    Build the reverse (creator to characters) response from query rows.
+
+    :param list rows: Rows as dicts
+    :return: The response
+    :rtype: dict
+    """
+    rows = list(rows)
+    data = {}
+    if rows:
+        data["creatorId"] = rows[0]["creator_id"]
+        data["creatorFullName"] = rows[0]["creator_full_name"]
+        data["characters"] = [{camelcase(k): v for k, v in qry.items() if "creator" not in k}
+                              for qry in rows]
+    return _info("totalCharacters", len(rows), data)
+
+def info_wrapper(builder):
     """
     Info Wrapper: Wraps the API resource with some helpful data.
+
+    The undecorated query method stays available as ``__wrapped__`` and the
+    response builder as ``info``, so the async API can run the same query.
+
+    :param callable builder: Builds the response from the query rows
     """
-    info_array = {}
-    now = datetime.now()
-    def _info_wrapper(*args):
-        query = method(*args)
-        total = query.count()
-        info_array["code"] = 200
-        info_array["attributionText"] = f"Data provided by Marvel. © {now.year} MARVEL"
-        info_array["totalCreators"] = total
-        data = {}
-        if total:
-            query = query.dicts()
-
-            if "character_id" in query[0]:
-                data["characterId"] = query[0]["character_id"]
-                data["characterName"] = query[0]["character_name"]
-
-            data["creators"] = []
-
-            for qry in query.dicts():
-                corrected_keys = {}
-                for k, v in qry.items():
-                    if "character" not in k:
-                        k = "resourceURI" if k == "resource_uri" else camelcase(k)
-                        v = json.loads(v) if k == "thumbnail" else v
-                        corrected_keys[k] = v
-                data["creators"].append(corrected_keys)
-        info_array["data"] = data
-        return info_array
-    return _info_wrapper
+    def decorator(method):
+        @wraps(method)
+        def _info_wrapper(*args):
+            return builder(method(*args).dicts())
+        _info_wrapper.info = builder
+        return _info_wrapper
+    return decorator
 
 class Resource:
     """
     Get API resource
     """
 
-    @info_wrapper
+    @info_wrapper(creators_info)
     def get_creators_by_character_id(self, id):
         """
         Get creators by character id
@@ -61,7 +104,7 @@ class Resource:
 
         return query
 
-    @info_wrapper
+    @info_wrapper(creators_info)
     def get_creators(self):
         """
         Get all creators.
@@ -72,7 +115,7 @@ class Resource:
 
         return query
 
-    @info_wrapper
+    @info_wrapper(creators_info)
     def get_creators_by_character_name(self, name):
         """
         Get creators by character name.
@@ -87,3 +130,20 @@ class Resource:
                  .order_by(Character.id, Creator.id, Creator.full_name))
 
         return query
+
+    @info_wrapper(characters_info)
+    def get_characters_by_creator_id(self, id):
+        """
+        Get characters by creator id
+
+        :param int id: Creator id to search for
+        """
+        query = (Creator
+                 .select(Creator.id.alias("creator_id"), Creator.full_name.alias("creator_full_name"),
+                         Character.id, Character.name)
+                 .join(CharacterCreators)
+                 .join(Character)
+                 .where(Creator.id == id)
+                 .order_by(Creator.id, Character.id, Character.name))
+
+        return query
@@ -13,3 +13,7 @@ DB_HOST = os.getenv("MYSQL_DB_HOST", "db")
 CACHE_HOST = os.getenv("REDIS_CACHE_HOST", "cache")
 SECRET_KEY = os.getenv("SECRET_KEY", "Your random string")
 CACHE_PREFIX = os.getenv("CACHE_PREFIX", "mct_")
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR") or None
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH") or None
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "20"))
+ASYNC_CACHE_POOL_SIZE = int(os.getenv("ASYNC_CACHE_POOL_SIZE", "50"))
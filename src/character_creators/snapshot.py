@@ -0,0 +1,200 @@
+from contextlib import contextmanager
+from datetime import datetime
+from glob import glob
+import os
+import tempfile
+
+from peewee import *
+
+from character_creators.models import Character, Creator, CharacterCreators
+
+# Bump whenever the snapshot schema changes in a way readers must know about.
+SNAPSHOT_FORMAT = 1
+
+# Tables served by the API. The series tables are only needed while loading.
+SNAPSHOT_MODELS = [Character, Creator, CharacterCreators]
+
+# How much of the snapshot file SQLite may memory-map (1 GiB is far more
+# than the whole file, so every read is served straight from shared pages).
+MMAP_SIZE = 1024 * 1024 * 1024
+
+# Snapshot versions kept on disk: the latest, plus the previous one for a
+# connection that resolved ``latest`` just before the swap.
+SNAPSHOT_KEEP = 2
+
+
+class SnapshotInfo(Model):
+    format = IntegerField()
+    version = CharField()
+    created = DateTimeField()
+    characters = IntegerField()
+    creators = IntegerField()
+    character_creators = IntegerField()
+
+    class Meta:
+        table_name = "snapshot_info"
+        primary_key = False
+
+
+@contextmanager
+def _collation(field, collation):
+    """
+    Temporarily override the collation of a model field.
+
+    MariaDB compares character names case-insensitively through the table
+    collation, SQLite needs it declared on the column itself.
+
+    :param Field field: The model field
+    :param str collation: The collation to use while the context is active
+    """
+    original = field.collation
+    field.collation = collation
+    try:
+        yield
+    finally:
+        field.collation = original
+
+
+class SnapshotDatabase(SqliteDatabase):
+    """
+    Read-only, memory-mapped snapshot database.
+
+    The path (usually the ``latest`` symlink) is resolved again on every new
+    connection, so per-request connections follow new exports and never try
+    to open a version that has since been pruned.
+
+    :param str path: The snapshot file, or the ``latest`` symlink
+    """
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        kwargs.setdefault("pragmas", {"mmap_size": MMAP_SIZE, "query_only": 1})
+        super().__init__(self._uri(), uri=True, **kwargs)
+
+    def _uri(self):
+        """
+        Get the sqlite URI of the snapshot file the path currently points at.
+
+        :returns: A read-only, immutable sqlite URI
+        :rtype: str
+        """
+        return f"file:{os.path.realpath(self.path)}?mode=ro&immutable=1"
+
+    def _connect(self):
+        self.database = self._uri()
+        conn = super()._connect()
+        (fmt,) = conn.execute("SELECT format FROM snapshot_info").fetchone()
+        if fmt != SNAPSHOT_FORMAT:
+            conn.close()
+            raise ValueError(f"Unsupported snapshot format {fmt} in {self.database}, "
+                             f"expected {SNAPSHOT_FORMAT}")
+        return conn
+
+
+def latest_snapshot(directory):
+    """
+    Get the snapshot file the ``latest`` symlink points at.
+
+    :param str directory: The snapshot directory
+    :returns: The snapshot path, or None if there is no snapshot yet
+    :rtype: str
+    """
+    latest = os.path.join(directory, "latest")
+    return os.path.realpath(latest) if os.path.exists(latest) else None
+
+
+def prune_snapshots(directory, keep=SNAPSHOT_KEEP):
+    """
+    Delete all but the newest snapshot versions. The ``latest`` target is
+    never deleted.
+
+    :param str directory: The snapshot directory
+    :param int keep: How many versions to keep, defaults to SNAPSHOT_KEEP
+    :returns: The deleted snapshot paths
+    :rtype: list
+    """
+    current = latest_snapshot(directory)
+    versions = sorted(glob(os.path.join(directory, "character_creators-*.db")), reverse=True)
+    removed = []
+    for path in versions[keep:]:
+        if os.path.realpath(path) != current:
+            os.unlink(path)
+            removed.append(path)
+    return removed
+
+
+def export_snapshot(directory, chunk_size=10000, keep=SNAPSHOT_KEEP):
+    """
+    Export the served tables into a new, immutable SQLite snapshot file.
+
+    The file is written under a temporary name, made read-only and renamed
+    into place, then the ``latest`` symlink is swapped to point at it. Readers
+    holding the previous version keep their file untouched, older versions
+    are pruned.
+
+    :param str directory: The directory to write snapshots into
+    :param int chunk_size: Rows per insert batch, defaults to 10000
+    :param int keep: How many versions to keep, defaults to SNAPSHOT_KEEP
+    :returns: The path of the new snapshot file
+    :rtype: str
+    """
+    os.makedirs(directory, exist_ok=True)
+    now = datetime.utcnow()
+    version = now.strftime("%Y%m%d%H%M%S%f")
+    path = os.path.join(directory, f"character_creators-{version}.db")
+    fd, tmp_path = tempfile.mkstemp(suffix=".db", dir=directory)
+    os.close(fd)
+
+    # Build the source queries before the models are re-bound to the snapshot.
+    sources = [(model, model.select().order_by(*model._meta.sorted_fields).dicts())
+               for model in SNAPSHOT_MODELS]
+    counts = {}
+    snapshot = SqliteDatabase(tmp_path, pragmas={"journal_mode": "off",
+                                                 "synchronous": "off"})
+    try:
+        with snapshot, snapshot.bind_ctx(SNAPSHOT_MODELS + [SnapshotInfo], bind_refs=False,
+                                         bind_backrefs=False):
+            with _collation(Character.name, "NOCASE"):
+                snapshot.create_tables(SNAPSHOT_MODELS + [SnapshotInfo])
+            for model, rows in sources:
+                table = model._meta.table_name
+                counts[table] = 0
+                with snapshot.atomic():
+                    for batch in chunked(rows.iterator(), chunk_size):
+                        model.insert_many(batch).execute()
+                        counts[table] += len(batch)
+            SnapshotInfo.create(format=SNAPSHOT_FORMAT, version=version, created=now, **counts)
+            snapshot.execute_sql("ANALYZE")
+        snapshot.execute_sql("VACUUM")
+        snapshot.close()
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+    latest = os.path.join(directory, "latest")
+    tmp_link = f"{latest}.{version}"
+    os.symlink(os.path.basename(path), tmp_link)
+    os.replace(tmp_link, latest)
+    prune_snapshots(directory, keep)
+    return path
+
+
+def open_snapshot(path):
+    """
+    Open a snapshot read-only and bind the served models to it.
+
+    The file is opened as immutable and memory-mapped, so every worker
+    process reading the same snapshot shares the page cache and no database
+    server connection is needed.
+
+    :param str path: The snapshot file, or the ``latest`` symlink
+    :returns: The snapshot database
+    :rtype: SnapshotDatabase
+    """
+    snapshot = SnapshotDatabase(path)
+    snapshot.connect()
+    snapshot.close()
+    snapshot.bind(SNAPSHOT_MODELS, bind_refs=False, bind_backrefs=False)
+    return snapshot
@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture
+def client():
+    """
+    The api app flask client, shared by the sync and async API tests.
+    """
+    from character_creators import api
+
+    api.app.config["TESTING"] = True
+
+    with api.app.test_client() as client:
+        yield client
@@ -1,16 +1,6 @@
-import pytest
-
-from character_creators import api
 from character_creators.settings import SECRET_KEY
 
 
-@pytest.fixture
-def client():
-    api.app.config["TESTING"] = True
-
-    with api.app.test_client() as client:
-        yield client
-
 def _common_assertions(res):
     """
     Common asseriomns that should pass for all endpoints
@@ -93,3 +83,22 @@ def test_character_creators_by_id(client):
         _common_assertions(res)
         _character_assertions(res)
         _character_assertions(res, name=character, _id=_id)
+
+def test_creator_characters_by_id(client):
+    """
+    Test /api/v1/creators/<int:id>/characters endpoint
+
+    :param FlaskClient client: The api app flask client
+    """
+    creators = {30: 1009610, 32: 1009610}
+
+    for _id, character_id in creators.items():
+        base = f"/api/v1/creators/{_id}/characters"
+        res = client.get(base).get_json()
+        assert "attributionText" in res
+        assert type(res["totalCharacters"]) is int
+        assert res["totalCharacters"] > 0
+        assert res["data"]["creatorId"] == _id
+        assert type(res["data"]["creatorFullName"]) is str
+        assert type(res["data"]["characters"]) is list
+        assert character_id in [c["id"] for c in res["data"]["characters"]]
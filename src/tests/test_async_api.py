@@ -0,0 +1,89 @@
+import asyncio
+
+from character_creators import async_api
+from character_creators.resource import Resource
+
+
+def _serving(func, *args):
+    """
+    Run a coroutine function with the async app's connection pools up
+
+    :param func: The coroutine function
+    :param args: The function arguments
+    :return: The function result
+    """
+    async def _run():
+        await async_api.app.startup()
+        try:
+            return await func(*args)
+        finally:
+            await async_api.app.shutdown()
+    return asyncio.get_event_loop().run_until_complete(_run())
+
+def _get(path):
+    """
+    GET a path from the async app
+
+    :param str path: The request path
+    :return: The status code and JSON body
+    :rtype: tuple
+    """
+    async def _request():
+        res = await async_api.app.test_client().get(path)
+        return res.status_code, await res.get_json()
+    return _serving(_request)
+
+def test_async_query_matches_sync():
+    """
+    Test every Resource query run on the aiomysql pool answers like the
+    synchronous Resource, bypassing the cache both apps share
+    """
+    queries = [(Resource.get_creators,),
+               (Resource.get_creators_by_character_name, "spider-man"),
+               (Resource.get_creators_by_character_id, 1009351),
+               (Resource.get_characters_by_creator_id, 30)]
+
+    for method, *args in queries:
+        res = _serving(async_api.query, method, *args)
+        assert res == method(Resource(), *args)
+
+def test_cached_runs_one_query_per_key(monkeypatch):
+    """
+    Test concurrent cache misses on the same key wait on a single query
+
+    :param MonkeyPatch monkeypatch: The pytest monkeypatch fixture
+    """
+    calls = []
+    stored = {}
+
+    async def cache_get(key):
+        return None
+
+    async def cache_set(key, value):
+        stored[key] = value
+
+    async def query(method, *args):
+        calls.append(args)
+        await asyncio.sleep(0.05)
+        return {"code": 200, "args": list(args)}
+
+    monkeypatch.setattr(async_api, "cache_get", cache_get)
+    monkeypatch.setattr(async_api, "cache_set", cache_set)
+    monkeypatch.setattr(async_api, "query", query)
+
+    async def _misses():
+        return await asyncio.gather(*[async_api.cached("30", Resource.get_creators_by_character_id, 30)
+                                      for _ in range(20)])
+
+    results = asyncio.get_event_loop().run_until_complete(_misses())
+    assert calls == [(30,)]
+    assert results == [{"code": 200, "args": [30]}] * 20
+    assert stored == {"30": {"code": 200, "args": [30]}}
+    assert not async_api.inflight
+
+def test_async_bad_requests():
+    """
+    Test the async app rejects empty and unknown query params
+    """
+    assert _get("/api/v1/creators?character_name=")[0] == 400
+    assert _get("/api/v1/creators?character=hulk")[0] == 400
@@ -0,0 +1,196 @@
+from peewee import ForeignKeyMetadata, IndexMetadata, MySQLDatabase
+import pytest
+
+from character_creators import loader as loader_module
+from character_creators.loader import Loader, LINK_MODELS
+from character_creators.models import (Character, CharacterSeries, Creator, CreatorSeries,
+        CharacterCreators, database)
+
+MODELS = [Character, CharacterSeries, Creator, CreatorSeries, CharacterCreators]
+
+
+class RecordingDatabase(MySQLDatabase):
+    """
+    A MySQL database that never connects: it answers schema questions from
+    the given tables, indexes and foreign keys and records every statement.
+
+    :param list tables: Existing table names
+    :param dict indexes: Existing index names per table
+    :param dict foreign_keys: Columns with a foreign key per table
+    """
+
+    def __init__(self, tables=(), indexes=None, foreign_keys=None):
+        super().__init__("character_creators")
+        self.tables = set(tables)
+        self.indexes = indexes or {}
+        self.foreign_keys = foreign_keys or {}
+        self.statements = []
+
+    def _connect(self):
+        return RecordingConnection()
+
+    def table_exists(self, table_name, schema=None):
+        return table_name in self.tables
+
+    def get_indexes(self, table, schema=None):
+        return [IndexMetadata(name, "", [], False, table) for name in self.indexes.get(table, [])]
+
+    def get_foreign_keys(self, table, schema=None):
+        return [ForeignKeyMetadata(column, "", "", table)
+                for column in self.foreign_keys.get(table, [])]
+
+    def execute_sql(self, sql, params=None, commit=None):
+        self.statements.append(sql)
+        return RecordingCursor(sql.count("@@"))
+
+    def ddl(self, prefix):
+        """
+        Get the recorded statements starting with a prefix.
+
+        :param str prefix: The statement prefix
+        :returns: The matching statements
+        :rtype: list
+        """
+        return [sql for sql in self.statements if sql.startswith(prefix)]
+
+
+class RecordingConnection:
+    server_version = "10.4.12-MariaDB"
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class RecordingCursor:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def fetchone(self):
+        return (1,) * self.columns
+
+
+@pytest.fixture
+def recording_db(monkeypatch):
+    """
+    Bind the models and the loader to a fresh RecordingDatabase.
+    """
+    def _bind(**kwargs):
+        db = RecordingDatabase(**kwargs)
+        db.bind(MODELS)
+        monkeypatch.setattr(loader_module, "db", db)
+        return db
+
+    yield _bind
+    database.bind(MODELS)
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """
+    A bulk loader whose character_series table was created bare, while
+    creator_series and character_creators already existed with their indexes.
+    """
+    def _create_tables(self):
+        if self.bulk:
+            self._deferred.add(CharacterSeries)
+
+    monkeypatch.setattr(Loader, "_create_tables", _create_tables)
+    monkeypatch.setattr(Loader, "_create_indexes", lambda self: None)
+    return Loader(api=None, bulk=True)
+
+def test_unique_checks_off_for_deferred_tables_only(loader):
+    """
+    Test unique checks are only turned off while loading a bare table
+
+    :param Loader loader: The bulk loader
+    """
+    assert loader._load_settings(CharacterSeries) == {"foreign_key_checks": 0,
+                                                      "unique_checks": 0}
+    for model in (CreatorSeries, CharacterCreators):
+        assert loader._load_settings(model) == {"foreign_key_checks": 0}
+
+def test_unique_checks_on_without_bulk(monkeypatch):
+    """
+    Test unique checks stay on for every table outside bulk mode
+
+    :param MonkeyPatch monkeypatch: The pytest monkeypatch fixture
+    """
+    monkeypatch.setattr(Loader, "_create_tables", lambda self: None)
+    monkeypatch.setattr(Loader, "_create_indexes", lambda self: None)
+    loader = Loader(api=None)
+
+    for model in LINK_MODELS:
+        assert loader._load_settings(model) == {"foreign_key_checks": 0}
+
+def test_upgrade_drops_legacy_fk_indexes(recording_db):
+    """
+    Test the upgrade step adds the covering indexes and drops the legacy
+    single-column foreign key indexes they replace, in one statement
+
+    :param callable recording_db: Binds a RecordingDatabase
+    """
+    tables = [m._meta.table_name for m in MODELS]
+    db = recording_db(tables=tables,
+                      indexes={"character_creators": ["charactercreators_character_id",
+                                                      "charactercreators_creator_id",
+                                                      "charactercreators_character_id_creator_id"]},
+                      foreign_keys={"character_creators": ["character_id", "creator_id"]})
+
+    Loader(api=None)
+    assert db.ddl("ALTER IGNORE TABLE `character_creators`") == ["ALTER IGNORE TABLE `character_creators` "
+                     "ADD INDEX `charactercreators_creator_id_character_id` "
+                     "(`creator_id`, `character_id`), "
+                     "DROP INDEX `charactercreators_character_id`, "
+                     "DROP INDEX `charactercreators_creator_id`"]
+
+def test_bulk_creates_bare_link_tables(recording_db):
+    """
+    Test bulk mode creates missing link tables without indexes or foreign
+    keys, and defers them
+
+    :param callable recording_db: Binds a RecordingDatabase
+    """
+    db = recording_db()
+
+    loader = Loader(api=None, bulk=True)
+    assert loader._deferred == set(LINK_MODELS)
+    for model in LINK_MODELS:
+        table = model._meta.table_name
+        (create,) = db.ddl(f"CREATE TABLE IF NOT EXISTS `{table}`")
+        assert "FOREIGN KEY" not in create
+        assert not [sql for sql in db.statements if f"ON `{table}`" in sql]
+    assert not db.ddl("ALTER")
+
+def test_build_indexes_adds_missing_pieces_only(recording_db):
+    """
+    Test a deferred table is completed in one statement holding only the
+    missing unique index, index and foreign key, and is no longer deferred
+
+    :param callable recording_db: Binds a RecordingDatabase
+    """
+    db = recording_db(indexes={"character_creators": ["charactercreators_character_id_creator_id"]},
+                      foreign_keys={"character_creators": ["character_id"]})
+    loader = Loader(api=None, bulk=True)
+    db.statements.clear()
+
+    loader._build_indexes(CharacterCreators)
+    assert db.ddl("ALTER IGNORE TABLE") == ["ALTER IGNORE TABLE `character_creators` "
+                     "ADD INDEX `charactercreators_creator_id_character_id` "
+                     "(`creator_id`, `character_id`), "
+                     "ADD FOREIGN KEY (`creator_id`) REFERENCES `creators` (`id`)"]
+    assert CharacterCreators not in loader._deferred
+
+    loader._build_indexes(CharacterSeries)
+    assert db.ddl("ALTER IGNORE TABLE `character_series`") == ["ALTER IGNORE TABLE `character_series` "
+                     "ADD UNIQUE INDEX `characterseries_series_id_character_id` "
+                     "(`series_id`, `character_id`), "
+                     "ADD INDEX `characterseries_character_id_series_id` "
+                     "(`character_id`, `series_id`), "
+                     "ADD FOREIGN KEY (`character_id`) REFERENCES `characters` (`id`)"]
+    assert loader._deferred == {CreatorSeries}
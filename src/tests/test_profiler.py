@@ -0,0 +1,36 @@
+import time
+
+from character_creators.profiler import Profiler
+
+
+def test_stage_times_are_exclusive():
+    """
+    Test a nested stage is only counted under the innermost stage
+    """
+    profiler = Profiler()
+    with profiler.run("creators"):
+        with profiler.stage("transform"):
+            time.sleep(0.01)
+            with profiler.stage("http"):
+                time.sleep(0.05)
+        profiler.rows("creators", 2)
+
+    stages = profiler.report()["entities"]["creators"]["stages"]
+    assert stages["http"]["calls"] == 1
+    assert stages["http"]["seconds"] >= 0.05
+    assert stages["transform"]["seconds"] < 0.05
+    assert profiler.report()["entities"]["creators"]["rows"] == {"creators": 2}
+
+def test_slowest_pages():
+    """
+    Test only the slowest pages are kept, slowest first
+    """
+    profiler = Profiler(slowest=2)
+    with profiler.run("characters"):
+        for offset, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+            profiler.page("characters", offset * 100, seconds, 1000)
+
+    report = profiler.report(calls=4)
+    assert report["calls"] == 4
+    assert report["bytes"] == 4000
+    assert [p["offset"] for p in report["slowest_pages"]] == [200, 0]
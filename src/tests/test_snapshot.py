@@ -0,0 +1,131 @@
+from copy import deepcopy
+import json
+import os
+
+from peewee import SqliteDatabase
+import pytest
+
+from character_creators.models import (Character, CharacterSeries, Creator, CreatorSeries,
+        CharacterCreators, database)
+from character_creators.resource import Resource
+from character_creators.snapshot import (SNAPSHOT_FORMAT, SnapshotInfo, export_snapshot,
+        latest_snapshot, open_snapshot, prune_snapshots)
+
+MODELS = [Character, CharacterSeries, Creator, CreatorSeries, CharacterCreators]
+
+
+@pytest.fixture
+def source():
+    """
+    An in-memory database standing in for MariaDB, with a few rows loaded.
+    The models are bound back to the real database afterwards.
+    """
+    src = SqliteDatabase(":memory:")
+    src.bind(MODELS)
+    src.create_tables(MODELS)
+    Character.insert_many([{"id": 1009610, "name": "Spider-Man"},
+                           {"id": 1009351, "name": "Hulk"}]).execute()
+    Creator.insert_many([{"id": 30, "full_name": "Stan Lee",
+                          "thumbnail": json.dumps({"extension": "jpg"})},
+                         {"id": 32, "full_name": "Steve Ditko",
+                          "thumbnail": json.dumps({"extension": "jpg"})}]).execute()
+    CharacterCreators.insert_many([{"character": 1009610, "creator": 30},
+                                   {"character": 1009610, "creator": 32},
+                                   {"character": 1009351, "creator": 30}]).execute()
+    yield src
+    database.bind(MODELS)
+
+def test_export_snapshot(source, tmp_path):
+    """
+    Test the exported snapshot is versioned, read-only and linked as latest
+
+    :param SqliteDatabase source: The source database
+    :param Path tmp_path: The snapshot directory
+    """
+    path = export_snapshot(str(tmp_path))
+
+    assert os.path.realpath(tmp_path / "latest") == path
+    assert not os.stat(path).st_mode & 0o222
+
+    snapshot = SqliteDatabase(path)
+    with snapshot.bind_ctx([SnapshotInfo]):
+        info = SnapshotInfo.get()
+    assert info.format == SNAPSHOT_FORMAT
+    assert path.endswith(f"character_creators-{info.version}.db")
+    assert (info.characters, info.creators, info.character_creators) == (2, 2, 3)
+
+def test_open_snapshot(source, tmp_path):
+    """
+    Test the resource serves the same results from an opened snapshot
+
+    :param SqliteDatabase source: The source database
+    :param Path tmp_path: The snapshot directory
+    """
+    expected = deepcopy(Resource().get_creators_by_character_id(1009610))
+    export_snapshot(str(tmp_path))
+    open_snapshot(str(tmp_path / "latest"))
+
+    assert Character._meta.database is not source
+    assert Resource().get_creators_by_character_id(1009610) == expected
+    assert Resource().get_creators_by_character_name("spider-man") == expected
+    assert Resource().get_creators_by_character_id(1009351)["totalCreators"] == 1
+    assert Resource().get_creators()["totalCreators"] == 2
+    assert Resource().get_characters_by_creator_id(30)["totalCharacters"] == 2
+
+def test_reconnect_after_exports(source, tmp_path):
+    """
+    Test a per-request reconnect follows latest after the opened version
+    was pruned
+
+    :param SqliteDatabase source: The source database
+    :param Path tmp_path: The snapshot directory
+    """
+    first = export_snapshot(str(tmp_path))
+    snapshot = open_snapshot(str(tmp_path / "latest"))
+    source.bind(MODELS)
+    Character.insert(id=1009368, name="Iron Man").execute()
+    export_snapshot(str(tmp_path))
+    export_snapshot(str(tmp_path))
+    assert not os.path.exists(first)
+
+    snapshot.connect()
+    try:
+        with snapshot.bind_ctx([Character]):
+            assert Character.select().count() == 3
+    finally:
+        snapshot.close()
+
+def test_prune_snapshots(tmp_path):
+    """
+    Test only the newest versions are kept, and never the latest target
+
+    :param Path tmp_path: The snapshot directory
+    """
+    versions = [f"character_creators-2026010100000{i}000000.db" for i in range(4)]
+    for version in versions:
+        (tmp_path / version).touch()
+    assert latest_snapshot(str(tmp_path)) is None
+
+    os.symlink(versions[0], tmp_path / "latest")
+    removed = prune_snapshots(str(tmp_path), keep=2)
+
+    assert sorted(os.path.basename(path) for path in removed) == [versions[1]]
+    assert sorted(os.listdir(tmp_path)) == sorted([versions[0], versions[2], versions[3], "latest"])
+    assert latest_snapshot(str(tmp_path)) == str(tmp_path / versions[0])
+
+def test_export_prunes_old_snapshots(source, tmp_path):
+    """
+    Test an export keeps only itself and the previous version
+
+    :param SqliteDatabase source: The source database
+    :param Path tmp_path: The snapshot directory
+    """
+    old = ["character_creators-20260101000000000000.db",
+           "character_creators-20260102000000000000.db"]
+    for version in old:
+        (tmp_path / version).touch()
+
+    path = export_snapshot(str(tmp_path))
+
+    assert latest_snapshot(str(tmp_path)) == path
+    assert sorted(os.listdir(tmp_path)) == sorted([old[1], os.path.basename(path), "latest"])